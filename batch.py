@@ -0,0 +1,137 @@
+"""Vectorized random rollouts for batches of games.
+
+This module requires NumPy. Instead of asking a Player for every action, all
+the random decisions for a batch of games are drawn at once and the games are
+advanced with array operations.
+"""
+
+import numpy as np
+
+from game_sim import Game
+
+
+def simulate_batch(game_cls, n, max_turns=64, n_actions=None, options=None,
+                   seed=None):
+    """Plays a batch of games with uniformly random actions.
+
+    All random decisions are drawn up front as a single (n, max_turns) array.
+    Games with the default rules (see Game.has_default_rules) are resolved
+    directly from the first terminating action of each row. Other games must
+    implement Game.vectorized_step, which is applied to the games still in
+    progress one turn at a time.
+
+    Args:
+        game_cls (type): class of the game to play
+        n (int): number of games to play
+        max_turns (int): games still in progress after this many turns are
+            cut off
+        n_actions (int): number of possible actions each turn, by default
+            the number of actions in game_cls._STATIC_ACTIONS
+        options (dict): options to be set for the game
+        seed (int): seed for the random number generator
+
+    Returns:
+        tuple: (n, n_players) array of final scores and array with the
+            number of turns each game lasted
+
+    Raises:
+        ValueError: if n_actions is less than 1, or differs from the number of
+            actions of a game with the default rules
+    """
+    default_rules = game_cls.has_default_rules()
+    if n_actions is None:
+        n_actions = len(game_cls._STATIC_ACTIONS)
+    if n_actions < 1:
+        raise ValueError("n_actions must be at least 1.")
+    if default_rules and n_actions != len(Game._STATIC_ACTIONS):
+        raise ValueError("n_actions must match Game._STATIC_ACTIONS for "
+                         "games with the default rules.")
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, n_actions, (n, max_turns),
+                           dtype=np.min_scalar_type(n_actions - 1))
+    n_players = len(game_cls(options=options).players)
+    scores = np.zeros((n, n_players), dtype=np.int64)
+
+    if default_rules:
+        ended = actions == 1
+        first_one = ended.argmax(axis=1)
+        turns = np.where(ended.any(axis=1), first_one + 1, max_turns)
+        return scores, turns
+    if game_cls.vectorized_step is Game.vectorized_step:
+        raise NotImplementedError("Batched simulation not implemented for "
+                                  "this game.")
+
+    turns = np.full(n, max_turns, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    for t in range(max_turns):
+        live = np.flatnonzero(alive)
+        if not live.size:
+            break
+        state, done = game_cls.vectorized_step(scores[live], actions[live, t])
+        scores[live] = state
+        ended = live[done]
+        turns[ended] = t + 1
+        alive[ended] = False
+    return scores, turns
+
+
+class BatchGames:
+    """State of a batch of games stored as one array per field.
+
+    Instead of one Game object per game, every field has an array with one
+    entry per game, so a turn of the whole batch is a few operations over
+    contiguous memory. The default step_all plays the default Game. Subclasses
+    override step_all with their own transition, typically a thin wrapper
+    around a numba.njit kernel that takes these arrays.
+
+    Attributes:
+        states (numpy.ndarray): (n, k) game specific state
+        scores (numpy.ndarray): score of each game
+        current_player (numpy.ndarray): current player of each game
+        alive (numpy.ndarray): whether each game is still in progress
+    """
+    def __init__(self, n, k=1, seed=None):
+        """Initializes a batch of games at their starting state.
+
+        Args:
+            n (int): number of games
+            k (int): number of state values per game
+            seed (int): seed for the random number generator
+        """
+        self.rng = np.random.default_rng(seed)
+        self.states = np.zeros((n, k), dtype=np.int64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.current_player = np.zeros(n, dtype=np.int8)
+        self.alive = np.ones(n, dtype=bool)
+
+    def step_all(self):
+        """Advances every game in progress 1 turn with a random action."""
+        actions = self.rng.integers(0, 2, size=int(self.alive.sum()))
+        self.alive[self.alive] &= actions != 1
+
+    def play_out(self, max_turns=None):
+        """Calls step_all until every game is over.
+
+        Args:
+            max_turns (int): stop after this many turns even if some games
+                are still in progress
+
+        Returns:
+            int: number of turns played
+        """
+        turns = 0
+        while self.alive.any() and (max_turns is None or turns < max_turns):
+            self.step_all()
+            turns += 1
+        return turns
+
+    def reward(self, i):
+        """Returns the score of one game in the batch.
+
+        Args:
+            i (int): index of the game
+
+        Returns:
+            int: score of the game
+        """
+        return int(self.scores[i])
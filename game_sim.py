@@ -2,11 +2,30 @@
 
 """
 
-import random as rand
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import copy
+from itertools import repeat
+from multiprocessing import get_context, shared_memory
+import os
+import pickle
+from random import (Random as _Random, getrandbits as _getrandbits,
+                    random as _random)
 import sys
+import threading
+
+try:
+    from game_sim_fast import FastGame, PCG32, atomic_add, atomic_sub
+except ImportError:
+    FastGame = PCG32 = atomic_add = atomic_sub = None
 
 DEFAULT_PROMPT = '> '
 
+# Scores of a single player at the start of a game; multiply to get one zero
+# per player, which is much faster than building an array from a list.
+_ZERO_SCORE = array('q', [0])
+
 
 class Game:
     """
@@ -16,6 +35,17 @@ class Game:
     the state. Classes have a set number of and advance when the current player
     returns an action.
     """
+    __slots__ = ("_players", "_scores", "_current_id", "_current_player",
+                 "game_over", "_opts", "_undo_stack",
+                 "_shm", "_shm_owner", "_scores_lock")
+
+    # Actions offered every turn of the default game and the actions that end
+    # it. Random players pick from these directly in step. The compiled and
+    # batched versions of the default game are only used while these keep
+    # their default values; see has_default_rules.
+    _STATIC_ACTIONS = (0, 1)
+    _TERMINAL_SET = frozenset({1})
+
     def __init__(self, state=None, options=None):
         """Initializes the game.
 
@@ -29,6 +59,11 @@ class Game:
                 overwritten if state is set
         """
         self.game_over = False
+        self._opts = {}
+        self._undo_stack = []
+        self._shm = None
+        self._shm_owner = False
+        self._scores_lock = None
         if options:
             self.update_options(options)
         if state:
@@ -39,16 +74,29 @@ class Game:
     def update_options(self, options):
         """Updates the options for the game state.
 
-        All the game options will be set as _opt_ followed by the name of the
-        option. These options will be used when the game is reset. This method
-        should be overridden to check that options are set to acceptable values
-        for the game start.
+        All the game options are stored in self._opts by name, and should be
+        read from there. Games with a __dict__, which is every subclass that
+        does not declare __slots__, also get each option as an attribute named
+        _opt_ followed by the name of the option. These options will be used
+        when the game is reset. This method should be overridden to check that
+        options are set to acceptable values for the game start.
 
         Args:
             options (dict): options to be set for the game
         """
-        for name in options:
-            setattr(self, "_opt_"+name, options[name])
+        self._store_options(options)
+
+    def _store_options(self, options):
+        """Stores options in self._opts and as _opt_ attributes if possible.
+
+        Args:
+            options (dict): options to be stored
+        """
+        self._opts.update(options)
+        attrs = getattr(self, "__dict__", None)
+        if attrs is not None:
+            for name in options:
+                attrs["_opt_" + name] = options[name]
 
     def reset_game(self):
         """Resets the game.
@@ -59,11 +107,45 @@ class Game:
         respect the options when setting up the game. It is also important to
         set self.game_over to be False in this method.
         """
-        self.players = [Player()]
-        self._scores = [0]
+        self.players = players = [Player()]
+        self._scores = _ZERO_SCORE * len(players)
         self._current_player_id = 0
         self.game_over = False
 
+    @property
+    def players(self):
+        """list: players of the game, indexed by player id"""
+        return self._players
+
+    @players.setter
+    def players(self, players):
+        self._players = players
+        self._current_player = None
+
+    @property
+    def _current_player_id(self):
+        """int: identifier of the player whose turn it is
+
+        The current player is cached so step does not have to look it up in
+        self.players every turn. Assigning this or self.players clears the
+        cache, and step fills it again on the next turn.
+        """
+        return self._current_id
+
+    @_current_player_id.setter
+    def _current_player_id(self, player_id):
+        self._current_id = player_id
+        self._current_player = None
+
+    def _set_current_player(self, player_id):
+        """Changes whose turn it is and caches the new current player.
+
+        Args:
+            player_id (int): The identifier for the player
+        """
+        self._current_id = player_id
+        self._current_player = self.players[player_id]
+
     def step(self):
         """Advances the game 1 turn.
 
@@ -75,12 +157,118 @@ class Game:
         """
         if self.game_over:
             return
-        possible_actions = ActionList(["0", "1"])
-        act = self.players[self._current_player_id].get_action(
-            possible_actions)
-        if act == "1":
+        player = self._current_player
+        if player is None:
+            player = self._current_player = self.players[self._current_id]
+        actions = self._STATIC_ACTIONS
+        if type(player) is Player and player.rng is None:
+            if PCG32 is None:
+                act = actions[int(_random() * len(actions))]
+            else:
+                act = actions[_thread_rng.bounded(len(actions))]
+        else:
+            act = player.get_action(ActionList.of(*actions))
+        if act in self._TERMINAL_SET:
             self.game_over = True
 
+    def apply(self, action):
+        """Plays an action for the current player.
+
+        This advances the game like step, but with the given action instead of
+        asking the player. The move can be taken back with undo, so a search
+        can explore alternatives without cloning the game for every node.
+        Games that override step should override apply and undo as well,
+        pushing whatever is needed to revert the move onto self._undo_stack.
+
+        Args:
+            action: action chosen for the current player
+        """
+        self._undo_stack.append((self._current_player_id, self.game_over))
+        if action in self._TERMINAL_SET:
+            self.game_over = True
+
+    def undo(self):
+        """Reverts the last action played with apply."""
+        player_id, self.game_over = self._undo_stack.pop()
+        self._set_current_player(player_id)
+
+    def clone(self):
+        """Returns an independent copy of the game.
+
+        By default this makes a deep copy of the game, which walks every
+        attribute. The players are shared with the copy rather than copied,
+        and the undo history is copied so moves made before cloning can be
+        undone on the copy. Games with large state should override this, for
+        example by rebuilding the game from a tuple of its state or with
+        pickle protocol 5, which passes NumPy buffers out of band instead of
+        copying them element by element.
+
+        Shared scores are not shared with the copy, which gets private scores
+        with the same values instead.
+
+        Returns:
+            Game: copy of the game
+        """
+        memo = {id(p): p for p in self.players}
+        game = copy.deepcopy(self, memo)
+        game._undo_stack = copy.deepcopy(self._undo_stack, memo)
+        return game
+
+    @classmethod
+    def has_default_rules(cls):
+        """Returns whether the game plays by the rules of the default game.
+
+        The compiled and batched versions of the default game assume its step,
+        its two actions 0 and 1, and that action 1 ends the game. They are
+        only used for games where this holds.
+
+        Returns:
+            boolean: True if step, _STATIC_ACTIONS and _TERMINAL_SET are the
+                defaults
+        """
+        return (cls.step is Game.step
+                and cls._STATIC_ACTIONS == Game._STATIC_ACTIONS
+                and cls._TERMINAL_SET == Game._TERMINAL_SET)
+
+    def play_out(self):
+        """Advances the game until it is over.
+
+        This calls step as long as game_over is False. When the compiled
+        game_sim_fast extension is available and this is the default game
+        played only by random Players, the whole game is played by FastGame
+        instead, seeded from the current player's random number generator.
+        """
+        if (FastGame is not None and self.has_default_rules()
+                and all(type(p) is Player for p in self.players)):
+            if not self.game_over:
+                rng = self.players[self._current_player_id].rng
+                seed = _getrandbits(64) if rng is None else rng.getrandbits(64)
+                FastGame(seed).play()
+                self.game_over = True
+            return
+        while not self.game_over:
+            self.step()
+
+    @staticmethod
+    def vectorized_step(state_array, action_array):
+        """Advances a batch of games 1 turn using NumPy operations.
+
+        This is the batched counterpart of step used by batch.simulate_batch.
+        Games that override step must override this as well to be simulated
+        in batches. Each row of state_array holds the scores of one game that
+        is still in progress, and action_array holds the index of the random
+        action chosen for that game this turn.
+
+        Args:
+            state_array (numpy.ndarray): per-game scores, one row per game
+            action_array (numpy.ndarray): chosen action index for each game
+
+        Returns:
+            tuple: updated state array and boolean array marking the games
+                that ended this turn
+        """
+        return state_array, action_array == 1
+
     def get_full_state(self):
         """This is used to get the full state of the game in text form.
 
@@ -121,6 +309,214 @@ class Game:
         """
         return self._scores[player_id]
 
+    def state_key(self):
+        """Returns a hashable representation of the game state.
+
+        Two games with equal keys must behave identically from then on. This
+        is used to recognize repeated positions in cached_rollout. Only games
+        that play by the default rules get a key from here; any other game
+        must override this.
+
+        Returns:
+            tuple: canonical game state
+
+        Raises:
+            NotImplementedError: if the game does not play by the default
+                rules and does not override this
+        """
+        if not self.has_default_rules():
+            raise NotImplementedError(
+                "state_key must be overridden by games with their own rules.")
+        return (self._current_player_id, self.game_over, tuple(self._scores))
+
+    def cached_rollout(self, depth, player_id=0, min_visits=1):
+        """Plays the game forward and returns the reward a player gains.
+
+        The game is advanced with step for at most depth turns. The reward of
+        each visited position is recorded in a shared transposition table
+        keyed on the game class, state_key, remaining depth and player. A
+        position with at least min_visits recorded rollouts is not played out
+        again and its average reward is used instead; otherwise the game is
+        played on and the new sample is added to the entry. With the default
+        of 1, the first sampled rollout from each position is memoized. The
+        game is modified by this call.
+
+        Args:
+            depth (int): maximum number of turns to play
+            player_id (int): The identifier for the player
+            min_visits (int): number of rollouts to sample from a position
+                before its average is reused
+
+        Returns:
+            float: expected reward for the player from the current state
+        """
+        path = []
+        value = 0.0
+        while depth > 0 and not self.game_over:
+            key = (type(self), self.state_key(), depth, player_id)
+            entry = _transpositions.get(key)
+            if entry is not None and entry[1] >= min_visits:
+                value = entry[0] / entry[1]
+                break
+            start = self._scores[player_id]
+            self.step()
+            path.append((key, self._scores[player_id] - start))
+            depth -= 1
+        for key, reward in reversed(path):
+            value += reward
+            _transpositions.add(key, value)
+        return value
+
+    def enable_shared_scores(self, n_players=None, name=None, lock=None):
+        """Moves the scores into a shared memory block.
+
+        This lets workers of a tree-parallel search, in threads or in other
+        processes, update the scores of the same game. The block is created
+        when name is not given, copying the current scores into it; otherwise
+        the existing block with that name is attached. Scores that were
+        already shared are released first.
+
+        Once enabled, scores should only be changed with add_score and the
+        virtual loss methods. With the compiled game_sim_fast extension these
+        are lock-free atomic adds on the block. Without it, they are guarded
+        by a multiprocessing lock that every process must share: pass the
+        scores_lock of the game that created the block when attaching to it,
+        or fork after enabling. Before Python 3.13, a process that was not
+        started by multiprocessing unlinks an attached block when it exits,
+        so the creator must outlive it.
+
+        Args:
+            n_players (int): number of score slots; defaults to the current
+                number of scores
+            name (str): name of an existing block to attach to
+            lock (multiprocessing.Lock): lock guarding the block when the
+                extension is not built; a new one is made for a new block
+
+        Returns:
+            str: name of the shared memory block
+        """
+        if self._shm is not None:
+            self.release_shared_scores(unlink=self._shm_owner)
+        if atomic_add is None and lock is None:
+            if name is not None:
+                raise ValueError("Attaching to shared scores without "
+                                 "game_sim_fast requires the creator's lock.")
+            lock = get_context().Lock()
+        if name is None:
+            n_players = n_players or len(self._scores)
+            shm = shared_memory.SharedMemory(create=True, size=8 * n_players)
+            scores = shm.buf.cast('q')
+            for i in range(min(n_players, len(self._scores))):
+                scores[i] = self._scores[i]
+        else:
+            shm = _attach_shared_memory(name)
+            scores = shm.buf.cast('q')
+        self._shm = shm
+        self._shm_owner = name is None
+        self._scores = scores
+        self._scores_lock = lock
+        return shm.name
+
+    @property
+    def scores_lock(self):
+        """multiprocessing.Lock: lock guarding shared scores, or None."""
+        return self._scores_lock
+
+    def release_shared_scores(self, unlink=False):
+        """Copies the scores out of shared memory and detaches from it.
+
+        Args:
+            unlink (bool): whether to also destroy the shared memory block;
+                this should be done once by the process that created it
+        """
+        if self._shm is None:
+            return
+        scores = self._scores
+        self._scores = array('q', scores)
+        scores.release()
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+        self._shm = None
+        self._shm_owner = False
+        self._scores_lock = None
+
+    def add_score(self, player_id, value):
+        """Adds a value to a player's score.
+
+        When the scores are shared, the add is atomic between the threads and
+        processes sharing them.
+
+        Args:
+            player_id (int): The identifier for the player
+            value (int): amount to add
+        """
+        if self._shm is None:
+            self._scores[player_id] += value
+        elif atomic_add is not None:
+            atomic_add(self._scores, player_id, value)
+        else:
+            with self._scores_lock:
+                self._scores[player_id] += value
+
+    def add_virtual_loss(self, player_id, n=1):
+        """Temporarily lowers a player's score while a rollout is running.
+
+        Tree-parallel searches apply a virtual loss before expanding a node
+        so other workers are steered towards different moves. It should be
+        undone with remove_virtual_loss once the real result is backed up.
+
+        Args:
+            player_id (int): The identifier for the player
+            n (int): size of the virtual loss
+        """
+        if self._shm is not None and atomic_sub is not None:
+            atomic_sub(self._scores, player_id, n)
+        else:
+            self.add_score(player_id, -n)
+
+    def remove_virtual_loss(self, player_id, n=1):
+        """Undoes a virtual loss applied with add_virtual_loss.
+
+        Args:
+            player_id (int): The identifier for the player
+            n (int): size of the virtual loss
+        """
+        self.add_score(player_id, n)
+
+    def __getstate__(self):
+        """Returns a compact representation of the game for pickling.
+
+        Scores held in a 64-bit integer array are stored as raw bytes, and
+        other scores, such as a list of floats, as a tuple. Games with shared
+        scores are unpickled with private ones. The undo history is not kept;
+        clone copies it separately. Subclasses that declare their own
+        __slots__ must extend this and __setstate__.
+
+        Returns:
+            tuple: game state
+        """
+        return (_pack_scores(self._scores), self._current_player_id,
+                self.game_over, self.players, self._opts,
+                getattr(self, "__dict__", None))
+
+    def __setstate__(self, state):
+        """Restores a game from the output of __getstate__.
+
+        Args:
+            state (tuple): game state
+        """
+        (scores, player_id, self.game_over, self.players, self._opts,
+         attrs) = state
+        self._scores = _unpack_scores(scores)
+        self._set_current_player(player_id)
+        self._undo_stack = []
+        self._shm = None
+        self._shm_owner = False
+        self._scores_lock = None
+        if attrs:
+            self.__dict__.update(attrs)
+
     def _load_state(self, state):
         """Loads state from a dictionary representation for state.
 
@@ -128,26 +524,186 @@ class Game:
             state (dict): previously saved state for game
         """
         for var in state:
-            setattr(self, var, state[var])
+            if var.startswith("_opt_"):
+                self._store_options({var[5:]: state[var]})
+            else:
+                setattr(self, var, state[var])
+
+    @classmethod
+    def run_many(cls, n, workers=None, options=None, seed=None):
+        """Plays many independent games in parallel and totals the rewards.
+
+        Each game is played to completion in a separate worker process with
+        its own random number generator, so throughput scales with the number
+        of cores. The game class must be importable at module level so it can
+        be sent to the workers.
+
+        Args:
+            n (int): number of games to play
+            workers (int): number of worker processes; defaults to the number
+                of CPUs
+            options (dict): options to be set for every game
+            seed (int): base seed; game i is seeded with seed + i
+
+        Returns:
+            list: total reward of each player summed over all games
+        """
+        if n <= 0:
+            return [0] * len(cls(options=options).players)
+        return _total_scores(_play_one, (cls, options), n, workers, seed)
+
+    def rollout_many(self, n, workers=None, seed=None):
+        """Plays many games to completion from the current state in parallel.
+
+        This is run_many starting from this game instead of a new one. The
+        game is pickled once with protocol 5 and every worker process plays
+        its own copy, so the game and its players must be picklable.
+
+        Args:
+            n (int): number of games to play
+            workers (int): number of worker processes; defaults to the number
+                of CPUs
+            seed (int): base seed; game i is seeded with seed + i
+
+        Returns:
+            list: total reward of each player summed over all games
+        """
+        if n <= 0:
+            return [0] * len(self.players)
+        payload = pickle.dumps(self, protocol=5)
+        return _total_scores(_play_from, payload, n, workers, seed)
+
+    @classmethod
+    def run_many_numba(cls, n, max_turns=64, options=None, seed=None):
+        """Plays many games with the compiled rollout kernel in rollouts_numba.
+
+        This requires NumPy and Numba and only applies to games with the
+        default rules (see has_default_rules). The games are played in
+        parallel threads of the current process.
+
+        Args:
+            n (int): number of games to play
+            max_turns (int): games still in progress after this many turns
+                are cut off
+            options (dict): options to be set for every game
+            seed (int): seed for the random number generators
+
+        Returns:
+            list: total reward of each player summed over all games
+        """
+        if not cls.has_default_rules():
+            raise NotImplementedError("Compiled rollouts not implemented for "
+                                      "this game.")
+        from rollouts_numba import make_seeds, run_default_rollouts
+        n_players = len(cls(options=options).players)
+        scores, _ = run_default_rollouts(n, max_turns, make_seeds(n, seed),
+                                         n_players)
+        return [int(total) for total in scores.sum(axis=0)]
+
+    @staticmethod
+    def stack_scores(games):
+        """Stacks the scores of several games into one contiguous buffer.
+
+        Scores are stored as 64-bit integers, one per player, so the scores of
+        a batch of games can be copied into a single block of memory and
+        analyzed or updated together. The result can be wrapped without
+        copying with numpy.asarray.
+
+        Args:
+            games (list): games with the same number of players
+
+        Returns:
+            memoryview: (n_games, n_players) view of the scores
+
+        Raises:
+            ValueError: if no games are given or their numbers of players
+                differ
+        """
+        games = list(games)
+        if not games:
+            raise ValueError("At least one game is needed to stack scores.")
+        n_players = len(games[0]._scores)
+        flat = array('q')
+        for game in games:
+            if len(game._scores) != n_players:
+                raise ValueError(
+                    "All games must have the same number of players.")
+            flat.extend(game._scores)
+        return memoryview(flat).cast('B').cast('q', (len(games), n_players))
 
     # TODO: add save and load from file functions
 
 
+def _attach_shared_memory(name):
+    """Attaches to an existing shared memory block without owning it.
+
+    From Python 3.13 the block is attached without registering it with the
+    resource tracker. Earlier versions always register it. Processes started
+    by multiprocessing share the tracker of their parent, so for them this
+    changes nothing and the block is still unlinked once by its creator. An
+    unrelated process that attaches has its own tracker, which unlinks the
+    block when that process exits, so the creator must outlive it there.
+
+    Args:
+        name (str): name of the block
+
+    Returns:
+        multiprocessing.shared_memory.SharedMemory: attached block
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
 class ActionList:
     """Representation of the list of possible actions.
 
     This is the base class for a list of possible actions. By default, each
-    action is represented by a string. This can also serve as a template for
-    action lists that require a more complex representation.
+    action is represented by a small integer code, or by a string for games
+    that need symbolic actions. This can also serve as a template for action
+    lists that require a more complex representation.
     """
-    def __init__(self, actions):
+    __slots__ = ("_actions", "_action_set", "_n", "_strings")
+
+    _INTERN_CACHE = {}
+
+    def __init__(self, actions, strings=None):
         """Initializes action list.
 
-        By default this takes in and stores a list of strings.
+        By default this takes in and stores a list of integers or strings. The
+        actions are kept in a tuple since the list should not change once
+        created.
         Args:
             actions (list): list of possible actions
+            strings (bool): whether the actions are strings rather than
+                integer codes; by default, actions are treated as strings
+                unless they are all integers
         """
-        self._actions = actions
+        self._actions = tuple(actions)
+        self._action_set = frozenset(self._actions)
+        self._n = len(self._actions)
+        if strings is None:
+            strings = not all(type(a) is int for a in self._actions)
+        self._strings = strings
+
+    @classmethod
+    def of(cls, *actions):
+        """Returns a shared action list for the given actions.
+
+        Games that offer the same actions every turn can use this instead of
+        creating a new action list each step. The list is created the first
+        time and reused afterwards, so it must not be modified.
+
+        Args:
+            *actions: possible actions
+
+        Returns:
+            ActionList: cached action list
+        """
+        al = cls._INTERN_CACHE.get((cls, actions))
+        if al is None:
+            al = cls._INTERN_CACHE[(cls, actions)] = cls(actions)
+        return al
 
     def __str__(self):
         """Shows possible actions in a human-readable way.
@@ -161,25 +717,81 @@ class ActionList:
         """
         return ""
 
-    def get_random_action(self):
+    def get_random_action(self, rng=None):
         """Returns a random action from a uniform distribution.
 
         The default player plays randomly. This function should sample from a
         uniform distribution ver the possible actions, but the behavior would
         be specific to each game.
 
+        Args:
+            rng (random.Random): generator to sample with; defaults to the
+                compiled generator of the current thread, or to the shared
+                random module generator without game_sim_fast
+
         Returns:
-            string: chosen action
+            int or string: chosen action
         """
-        return rand.choice(self._actions)
+        if rng is None:
+            if PCG32 is None:
+                return self._actions[int(_random() * self._n)]
+            return self._actions[_thread_rng.bounded(self._n)]
+        return self._actions[int(rng.random() * self._n)]
 
     def isValid(self, input_str):
         """Returns whether the user input is a valid action.
 
+        Integer actions are parsed from the input, so input that is not a
+        number is never valid for them.
+
         Return:
             boolean: True if action is valid
         """
-        return input_str in self._actions
+        if not self._strings:
+            try:
+                input_str = int(input_str)
+            except ValueError:
+                return False
+        return input_str in self._action_set
+
+    def parse(self, input_str):
+        """Converts valid user input to the action it represents.
+
+        Args:
+            input_str (string): user input accepted by isValid
+
+        Returns:
+            int or string: chosen action
+        """
+        return input_str if self._strings else int(input_str)
+
+
+class _ThreadRNG(threading.local):
+    """Compiled random number generator private to each thread.
+
+    This is only used when game_sim_fast is built. Each thread seeds its own
+    PCG32 generator from os.urandom the first time it uses _thread_rng, and
+    the importing thread does so at import. A forked child reseeds the
+    generator of the thread that forked, so it does not replay the parent's
+    stream. Without the extension, random actions come from the shared
+    random.random, which the random module reseeds after a fork itself.
+    """
+    def __init__(self):
+        self.seed()
+
+    def seed(self):
+        """Reseeds the generator of the current thread from os.urandom."""
+        seed = os.urandom(16)
+        self.bounded = PCG32(int.from_bytes(seed[:8], "little"),
+                             int.from_bytes(seed[8:], "little")).bounded
+
+
+if PCG32 is not None:
+    _thread_rng = _ThreadRNG()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_thread_rng.seed)
+else:
+    _thread_rng = None
 
 
 class Player:
@@ -189,8 +801,16 @@ class Player:
     extended to be an interface for a human or it can follow some policy. This
     abstraction allows the game rules to ignore the nature of the player.
     """
-    def __init__(self):
-        pass
+    __slots__ = ("rng",)
+
+    def __init__(self, rng=None):
+        """Initializes the player.
+
+        Args:
+            rng (random.Random): generator used for random play; defaults to
+                the shared module generator
+        """
+        self.rng = rng
 
     def get_action(self, possible):
         """Returns an action from the player.
@@ -200,9 +820,9 @@ class Player:
         Args:
             possible (ActionList): a representation of the possible actions
         Returns:
-            string: random action
+            int or string: random action
         """
-        return possible.get_random_action()
+        return possible.get_random_action(getattr(self, "rng", None))
 
 
 class CLI_Player(Player):
@@ -212,9 +832,23 @@ class CLI_Player(Player):
     no matter what kind of player is playing the game. This class prints to the
     terminal and gets user input as well as checking for valid inputs.
     """
-    def __init__(self, ostream=sys.stdout):
+    __slots__ = ("out", "flush", "input")
+
+    _SELECT_PROMPT = "\nSelect an action: "
+    _INVALID_MESSAGE = "Not a valid action!\n"
+
+    def __init__(self, ostream=sys.stdout, istream=sys.stdin):
+        """Initializes the player.
+
+        Args:
+            ostream (file): stream the prompts are written to
+            istream (file): stream the actions are read from, one per line;
+                this can be a file to replay recorded games
+        """
+        super().__init__()
         self.out = ostream.write
-        self.input = sys.stdin  # TODO: enable reading from filestream
+        self.flush = getattr(ostream, "flush", lambda: None)
+        self.input = istream
 
     def get_action(self, possible):
         """Returns an action inputted by a human.
@@ -226,14 +860,196 @@ class CLI_Player(Player):
             possible (ActionList): a representation of the possible actions
 
         Returns:
-            string: chosen action
+            int or string: chosen action
+
+        Raises:
+            EOFError: if the input stream ends before a valid action is read
         """
-        self.out(possible)
-        self.out("Select an action: ")
-        inp = input()
+        prompt = str(possible) + self._SELECT_PROMPT
+        self.out(prompt)
+        self.flush()
+        inp = self._read_line()
         while not possible.isValid(inp):
-            self.out("Not a valid action!")
-            self.out(possible)
-            self.out("Select an action: ")
-            inp = input()
-        return inp
+            self.out(self._INVALID_MESSAGE + prompt)
+            self.flush()
+            inp = self._read_line()
+        return possible.parse(inp)
+
+    def _read_line(self):
+        """Reads one line of input without the trailing line ending.
+
+        Returns:
+            string: line read from the input stream
+        """
+        line = self.input.readline()
+        if not line:
+            raise EOFError("Input stream ended before a valid action.")
+        return line.rstrip("\r\n")
+
+
+class TranspositionTable:
+    """Size-capped cache of rollout rewards keyed on game state.
+
+    Each entry holds the total reward and the number of visits for a position,
+    and the least recently used entries are dropped once the table is full.
+    The table is split into shards with their own locks so that threads
+    searching in parallel rarely wait on each other.
+    """
+    __slots__ = ("_shards", "_locks", "_shard_size")
+
+    def __init__(self, max_entries=1 << 16, n_shards=16):
+        """Initializes an empty table.
+
+        Args:
+            max_entries (int): maximum number of entries kept
+            n_shards (int): number of independently locked shards
+        """
+        self._shards = [OrderedDict() for _ in range(n_shards)]
+        self._locks = [threading.Lock() for _ in range(n_shards)]
+        self._shard_size = max(1, max_entries // n_shards)
+
+    def get(self, key):
+        """Returns the entry for a position.
+
+        Args:
+            key (tuple): position key
+
+        Returns:
+            tuple: total reward and number of visits, or None if not stored
+        """
+        i = hash(key) % len(self._shards)
+        with self._locks[i]:
+            shard = self._shards[i]
+            entry = shard.get(key)
+            if entry is not None:
+                shard.move_to_end(key)
+            return entry
+
+    def add(self, key, reward):
+        """Records one visit of a position.
+
+        Args:
+            key (tuple): position key
+            reward (float): reward gained from the position
+        """
+        i = hash(key) % len(self._shards)
+        with self._locks[i]:
+            shard = self._shards[i]
+            total, visits = shard.pop(key, (0, 0))
+            shard[key] = (total + reward, visits + 1)
+            if len(shard) > self._shard_size:
+                shard.popitem(last=False)
+
+    def clear(self):
+        """Removes all entries."""
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+
+_transpositions = TranspositionTable()
+
+
+def _total_scores(play, payload, n, workers, seed):
+    """Plays games in worker processes and totals the scores.
+
+    Workers are started with the spawn method so they do not inherit the
+    state of the parent process.
+
+    Args:
+        play (function): module level function called as play(payload, seed)
+            that returns the final scores of one game packed with
+            _pack_scores
+        payload: description of the game sent to every worker
+        n (int): number of games to play
+        workers (int): number of worker processes; defaults to the number of
+            CPUs
+        seed (int): base seed; game i is seeded with seed + i
+
+    Returns:
+        list: total reward of each player summed over all games
+    """
+    if seed is None:
+        seed = _getrandbits(32)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, n // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=get_context("spawn")) as executor:
+        results = executor.map(play, repeat(payload), range(seed, seed + n),
+                               chunksize=chunksize)
+        return [sum(scores)
+                for scores in zip(*(_unpack_scores(r) for r in results))]
+
+
+def _play_one(spec, seed):
+    """Plays a new game to completion for Game.run_many.
+
+    Args:
+        spec (tuple): class of the game to play and options to be set for it
+        seed (int): seed for the random players of this game
+
+    Returns:
+        bytes or tuple: final score of each player
+    """
+    game_cls, options = spec
+    return _play_seeded(game_cls(options=options), seed)
+
+
+def _play_from(payload, seed):
+    """Plays a pickled game to completion for Game.rollout_many.
+
+    Args:
+        payload (bytes): game pickled with protocol 5
+        seed (int): seed for the random players of this game
+
+    Returns:
+        bytes or tuple: final score of each player
+    """
+    return _play_seeded(pickle.loads(payload), seed)
+
+
+def _play_seeded(game, seed):
+    """Plays a game to completion with seeded random players.
+
+    Args:
+        game (Game): game to play
+        seed (int): seed for the random players of the game
+
+    Returns:
+        bytes or tuple: final score of each player
+    """
+    rng = _Random(seed)
+    for player in game.players:
+        player.rng = rng
+    game.play_out()
+    return _pack_scores(game._scores)
+
+
+def _pack_scores(scores):
+    """Returns scores in a compact form for pickling.
+
+    Args:
+        scores: scores of a game; an array('q'), a shared memoryview or any
+            sequence of numbers
+
+    Returns:
+        bytes or tuple: raw bytes for 64-bit integer scores, otherwise a tuple
+    """
+    if (isinstance(scores, memoryview)
+            or (isinstance(scores, array) and scores.typecode == 'q')):
+        return scores.tobytes()
+    return tuple(scores)
+
+
+def _unpack_scores(packed):
+    """Restores scores packed with _pack_scores.
+
+    Args:
+        packed (bytes or tuple): packed scores
+
+    Returns:
+        array or list: scores
+    """
+    if isinstance(packed, bytes):
+        return array('q', packed)
+    return list(packed)
@@ -0,0 +1,149 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""Compiled helpers for game_sim.
+
+This extension is optional. Build it in place with
+
+    cythonize -i -3 game_sim_fast.pyx
+
+and game_sim will use it to draw random actions, to play out default games
+between random players and to update shared scores atomically.
+"""
+
+cimport cython
+from libc.stdint cimport int64_t, uint32_t, uint64_t
+
+
+cdef extern from *:
+    """
+    static inline int64_t game_sim_fetch_add(int64_t *p, int64_t v) {
+        return __atomic_fetch_add(p, v, __ATOMIC_RELAXED);
+    }
+    static inline int64_t game_sim_fetch_sub(int64_t *p, int64_t v) {
+        return __atomic_fetch_sub(p, v, __ATOMIC_RELAXED);
+    }
+    """
+    int64_t game_sim_fetch_add(int64_t *p, int64_t v) nogil
+    int64_t game_sim_fetch_sub(int64_t *p, int64_t v) nogil
+
+
+@cython.boundscheck(True)
+def atomic_add(int64_t[::1] scores, Py_ssize_t i, int64_t value):
+    """Atomically adds a value to one entry of a 64-bit integer buffer.
+
+    The add is a single hardware instruction, so it is safe between threads
+    and between processes mapping the same shared memory.
+
+    Args:
+        scores (memoryview): writable buffer of 64-bit integers
+        i (int): index of the entry
+        value (int): amount to add
+
+    Returns:
+        int: value of the entry before the add
+    """
+    return game_sim_fetch_add(&scores[i], value)
+
+
+@cython.boundscheck(True)
+def atomic_sub(int64_t[::1] scores, Py_ssize_t i, int64_t value):
+    """Atomically subtracts a value from one entry of a 64-bit integer buffer.
+
+    Args:
+        scores (memoryview): writable buffer of 64-bit integers
+        i (int): index of the entry
+        value (int): amount to subtract
+
+    Returns:
+        int: value of the entry before the subtraction
+    """
+    return game_sim_fetch_sub(&scores[i], value)
+
+
+cdef class PCG32:
+    """PCG32 random number generator.
+
+    The whole generator state is 16 bytes, and a draw is a multiply, an add
+    and a few shifts, so every thread can cheaply keep its own generator.
+    """
+    cdef uint64_t _state
+    cdef uint64_t _inc
+
+    def __init__(self, uint64_t seed=0, uint64_t stream=0):
+        """Initializes the generator.
+
+        Args:
+            seed (int): starting state
+            stream (int): selects one of 2**63 independent sequences
+        """
+        self._state = 0
+        self._inc = (stream << 1) | 1
+        self._next()
+        self._state += seed
+        self._next()
+
+    cdef inline uint32_t _next(self):
+        cdef uint64_t old = self._state
+        cdef uint32_t xorshifted, rot
+        self._state = old * 6364136223846793005ULL + self._inc
+        xorshifted = <uint32_t>(((old >> 18) ^ old) >> 27)
+        rot = <uint32_t>(old >> 59)
+        return (xorshifted >> rot) | (xorshifted << ((-rot) & 31))
+
+    cdef inline uint32_t _bounded(self, uint32_t n):
+        return <uint32_t>((<uint64_t>self._next() * n) >> 32)
+
+    cpdef uint32_t next(self):
+        """Returns a random 32-bit integer."""
+        return self._next()
+
+    cpdef uint32_t bounded(self, uint32_t n):
+        """Returns a random integer in [0, n).
+
+        This maps a 32-bit draw onto the range with a multiply and shift
+        instead of a division.
+        """
+        return self._bounded(n)
+
+
+cdef class FastGame:
+    """Compiled version of the default Game played by random Players.
+
+    Random actions are drawn from a PCG32 generator, so a whole game can be
+    played without returning to the interpreter.
+    """
+    cdef PCG32 _rng
+    cdef readonly uint32_t n_actions
+    cdef readonly bint game_over
+    cdef readonly long turns
+
+    def __init__(self, uint64_t seed=0, uint32_t n_actions=2):
+        """Initializes the game.
+
+        Args:
+            seed (int): seed for the random actions
+            n_actions (int): number of possible actions each turn
+        """
+        self._rng = PCG32(seed, seed)
+        self.n_actions = n_actions
+        self.game_over = False
+        self.turns = 0
+
+    cpdef step(self):
+        """Advances the game 1 turn."""
+        if self.game_over:
+            return
+        self.turns += 1
+        if self._rng._bounded(self.n_actions) == 1:
+            self.game_over = True
+
+    cpdef long play(self):
+        """Plays the game until it is over.
+
+        Returns:
+            int: number of turns played
+        """
+        while not self.game_over:
+            self.turns += 1
+            if self._rng._bounded(self.n_actions) == 1:
+                self.game_over = True
+        return self.turns
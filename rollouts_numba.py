@@ -0,0 +1,59 @@
+"""Numba-compiled random rollouts of the default game.
+
+This module requires NumPy and Numba. The rollouts are spread over all cores
+with prange inside a single process, so nothing has to be serialized between
+workers as in Game.run_many.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+_LCG_MULT = np.uint64(6364136223846793005)
+_LCG_INC = np.uint64(1442695040888963407)
+_TOP_BIT = np.uint64(63)
+
+
+@njit(parallel=True, cache=True)
+def run_default_rollouts(n, max_turns, seeds, n_players=1):
+    """Plays the default game n times with uniformly random actions.
+
+    Each game draws its actions from its own 64-bit linear congruential
+    generator, taking the top bit of the state as the action.
+
+    Args:
+        n (int): number of games to play
+        max_turns (int): games still in progress after this many turns are
+            cut off
+        seeds (numpy.ndarray): uint64 seed for each game
+        n_players (int): number of players in each game
+
+    Returns:
+        tuple: (n, n_players) array of final scores and array with the
+            number of turns each game lasted
+    """
+    scores = np.zeros((n, n_players), np.int64)
+    turns = np.empty(n, np.int64)
+    for i in prange(n):
+        s = seeds[i]
+        t = 0
+        while t < max_turns:
+            s = s * _LCG_MULT + _LCG_INC
+            t += 1
+            if s >> _TOP_BIT:
+                break
+        turns[i] = t
+    return scores, turns
+
+
+def make_seeds(n, seed=None):
+    """Returns independent uint64 seeds for run_default_rollouts.
+
+    Args:
+        n (int): number of games
+        seed (int): seed for the generator the seeds are drawn from
+
+    Returns:
+        numpy.ndarray: one seed per game
+    """
+    return np.random.default_rng(seed).integers(
+        0, np.iinfo(np.uint64).max, n, dtype=np.uint64, endpoint=True)
@@ -0,0 +1,232 @@
+"""Regression tests for game_sim.
+
+Run with python -m unittest from the repository root.
+"""
+
+from array import array
+import os
+import pickle
+import unittest
+from unittest import mock
+
+import game_sim
+from game_sim import ActionList, Game, Player
+
+
+class ListScoreGame(Game):
+    """Two player game that keeps its scores in a list of floats."""
+
+    def reset_game(self):
+        self.players = [Player(), Player()]
+        self._scores = [0.0, 0.0]
+        self._current_player_id = 0
+        self.game_over = False
+        self.note = "list"
+
+
+class CountingGame(Game):
+    """Two player game where player i scores i + 1 on each of its turns."""
+
+    steps = 0
+
+    def reset_game(self):
+        self.players = [Player(), Player()]
+        self._scores = [0, 0]
+        self._current_player_id = 0
+        self.game_over = False
+        self.turn = 0
+
+    def step(self):
+        CountingGame.steps += 1
+        player_id = self._current_player_id
+        self._scores[player_id] += player_id + 1
+        self.turn += 1
+        self._current_player_id = 1 - player_id
+
+    def state_key(self):
+        return (self._current_player_id, self.turn)
+
+
+class UnkeyedGame(CountingGame):
+    """Game with its own rules that relies on the base state_key."""
+
+    state_key = Game.state_key
+
+
+class DiceGame(Game):
+    """Two player game where each turn scores a random number of points.
+
+    It is defined at module level so run_many can send it to its workers.
+    """
+
+    def reset_game(self):
+        self.players = [Player(), Player()]
+        self._scores = array('q', [0, 0])
+        self._current_player_id = 0
+        self.game_over = False
+
+    def step(self):
+        player_id = self._current_player_id
+        act = self.players[player_id].get_action(ActionList.of(0, 1, 2, 3))
+        self._scores[player_id] += act
+        if act == 0:
+            self.game_over = True
+        self._current_player_id = 1 - player_id
+
+
+class TestCopy(unittest.TestCase):
+
+    def check_copy(self, game, copy):
+        self.assertIsNot(copy, game)
+        self.assertEqual(type(copy), type(game))
+        self.assertEqual(list(copy._scores), list(game._scores))
+        self.assertEqual(type(copy._scores), type(game._scores))
+        self.assertEqual(copy._current_player_id, game._current_player_id)
+        self.assertEqual(copy.game_over, game.game_over)
+        copy._scores[0] += 1
+        self.assertNotEqual(copy._scores[0], game._scores[0])
+
+    def test_pickle_default_scores(self):
+        game = Game()
+        game._scores[0] = 7
+        copy = pickle.loads(pickle.dumps(game, protocol=5))
+        self.check_copy(game, copy)
+        self.assertEqual(copy._scores.typecode, 'q')
+
+    def test_pickle_float_list_scores(self):
+        game = ListScoreGame()
+        game._scores[1] = 2.5
+        game._set_current_player(1)
+        copy = pickle.loads(pickle.dumps(game))
+        self.check_copy(game, copy)
+        self.assertEqual(copy.note, "list")
+        self.assertIs(copy._current_player, copy.players[1])
+
+    def test_clone_float_list_scores(self):
+        game = ListScoreGame()
+        game._scores[0] = 1.5
+        copy = game.clone()
+        self.check_copy(game, copy)
+        self.assertIs(copy.players[0], game.players[0])
+
+    def test_clone_keeps_undo_history(self):
+        game = Game()
+        game.apply(0)
+        copy = game.clone()
+        self.assertEqual(copy._undo_stack, game._undo_stack)
+        self.assertIsNot(copy._undo_stack, game._undo_stack)
+        copy.undo()
+        self.assertEqual(len(game._undo_stack), 1)
+
+    def test_clone_shared_scores(self):
+        game = Game()
+        game.enable_shared_scores()
+        try:
+            game.add_score(0, 3)
+            copy = game.clone()
+            self.assertIsNone(copy._shm)
+            self.assertEqual(type(copy._scores), array)
+            self.assertEqual(list(copy._scores), [3])
+            copy._scores[0] = 0
+            self.assertEqual(game._scores[0], 3)
+        finally:
+            game.release_shared_scores(unlink=True)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+class TestSharedScores(unittest.TestCase):
+
+    N_CHILDREN = 4
+    N_ADDS = 20000
+
+    def play_forked(self):
+        game = Game()
+        game.enable_shared_scores(2)
+        try:
+            pids = []
+            for _ in range(self.N_CHILDREN):
+                pid = os.fork()
+                if pid == 0:
+                    code = 1
+                    try:
+                        for _ in range(self.N_ADDS):
+                            game.add_score(0, 1)
+                            game.add_virtual_loss(1)
+                            game.remove_virtual_loss(1)
+                        code = 0
+                    finally:
+                        os._exit(code)
+                pids.append(pid)
+            for pid in pids:
+                _, status = os.waitpid(pid, 0)
+                self.assertEqual(status, 0)
+            return list(game._scores)
+        finally:
+            game.release_shared_scores(unlink=True)
+
+    def test_forked_totals_with_lock(self):
+        with mock.patch.multiple(game_sim, atomic_add=None, atomic_sub=None):
+            scores = self.play_forked()
+        self.assertEqual(scores, [self.N_CHILDREN * self.N_ADDS, 0])
+
+    @unittest.skipIf(game_sim.atomic_add is None,
+                     "game_sim_fast is not built")
+    def test_forked_totals_atomic(self):
+        scores = self.play_forked()
+        self.assertEqual(scores, [self.N_CHILDREN * self.N_ADDS, 0])
+
+
+class TestCachedRollout(unittest.TestCase):
+
+    def setUp(self):
+        game_sim._transpositions.clear()
+        CountingGame.steps = 0
+
+    def test_rewards_are_per_player(self):
+        self.assertEqual(CountingGame().cached_rollout(4, player_id=0), 2)
+        self.assertEqual(CountingGame().cached_rollout(4, player_id=1), 4)
+        self.assertEqual(CountingGame.steps, 8)
+
+    def test_first_rollout_is_reused(self):
+        self.assertEqual(CountingGame().cached_rollout(4), 2)
+        self.assertEqual(CountingGame().cached_rollout(4), 2)
+        self.assertEqual(CountingGame.steps, 4)
+
+    def test_min_visits(self):
+        for _ in range(3):
+            self.assertEqual(CountingGame().cached_rollout(4, min_visits=3),
+                             2)
+        self.assertEqual(CountingGame.steps, 12)
+        self.assertEqual(CountingGame().cached_rollout(4, min_visits=3), 2)
+        self.assertEqual(CountingGame.steps, 12)
+
+    def test_custom_rules_need_state_key(self):
+        with self.assertRaises(NotImplementedError):
+            UnkeyedGame().cached_rollout(4)
+
+    def test_default_game(self):
+        self.assertEqual(Game().cached_rollout(8), 0)
+
+
+class TestRunMany(unittest.TestCase):
+
+    def test_seeded_runs_repeat(self):
+        first = DiceGame.run_many(40, workers=2, seed=11)
+        self.assertEqual(len(first), 2)
+        self.assertGreater(sum(first), 0)
+        self.assertEqual(DiceGame.run_many(40, workers=2, seed=11), first)
+        self.assertEqual(DiceGame.run_many(40, workers=3, seed=11), first)
+
+    def test_seeded_rollouts_repeat(self):
+        game = DiceGame()
+        game._scores[1] = 5
+        first = game.rollout_many(20, workers=2, seed=3)
+        self.assertGreaterEqual(first[1], 20 * 5)
+        self.assertEqual(game.rollout_many(20, workers=2, seed=3), first)
+
+    def test_no_games(self):
+        self.assertEqual(DiceGame.run_many(0), [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()